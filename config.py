@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -18,6 +19,7 @@ class Settings(BaseSettings):
     timeout_seconds: int = Field(default=30)
 
     imagen_rpm_limit: int = Field(default=60)
+    imagen_max_concurrent_requests: int = Field(default=4)
 
     output_dir: Path = Field(default=Path("outputs"))
     reports_dir: Path = Field(default=Path("reports"))
@@ -27,6 +29,7 @@ class Settings(BaseSettings):
     dropbox_access_token: str = Field(default="")
     dropbox_upload_enabled: bool = Field(default=True)
     dropbox_base_path: str = Field(default="/creative-automation")
+    dropbox_upload_concurrency: int = Field(default=8)
 
     class Config:
         env_file = ".env"
@@ -34,11 +37,31 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-settings = Settings()
+def ensure_directories(*directories: Path) -> None:
+    # After the first run every directory exists, so only stat them
+    for directory in directories:
+        if not directory.is_dir():
+            directory.mkdir(parents=True, exist_ok=True)
 
-settings.output_dir.mkdir(exist_ok=True)
-settings.reports_dir.mkdir(exist_ok=True)
-settings.assets_dir.mkdir(exist_ok=True)
-(settings.assets_dir / "products").mkdir(exist_ok=True)
-(settings.assets_dir / "brands").mkdir(exist_ok=True)
-(settings.assets_dir / "fonts").mkdir(exist_ok=True)
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    # Parse .env and validate once per process
+    settings = Settings()
+
+    ensure_directories(
+        settings.output_dir,
+        settings.reports_dir,
+        settings.assets_dir / "products",
+        settings.assets_dir / "brands",
+        settings.assets_dir / "fonts"
+    )
+
+    return settings
+
+
+def __getattr__(name: str):
+    # Backward compatible `from config import settings`, parsed on first access
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,23 @@
+import asyncio
 import logging
+import logging.handlers
 import json
+import queue
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from pydantic import ValidationError
 
-from config import settings
-from schemas.campaign import CampaignBrief, CampaignOutput
+try:
+    import orjson
+except ImportError:  # Optional faster JSON parser
+    orjson = None
+
+from config import get_settings
+from schemas.campaign import CampaignBrief, CampaignOutput, LegalCheckResult, Product
 from modules.vertex_ai_service import VertexAIService
 from modules.asset_manager import AssetManager
 from modules.campaign_composer import CampaignComposer
@@ -18,16 +27,6 @@ from modules.reporter import Reporter
 from modules.dropbox_uploader import DropboxUploader
 
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format='%(levelname)s: %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('creative_automation.log')
-    ]
-)
-
 # Disable verbose HTTP logging from Google SDK and Dropbox
 logging.getLogger('google.auth').setLevel(logging.WARNING)
 logging.getLogger('google.api_core').setLevel(logging.WARNING)
@@ -39,8 +38,24 @@ logging.getLogger('dropbox').setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+_LANGUAGE_MAP = {
+    "quebec": "French",
+    "france": "French",
+    "mexico": "Spanish",
+    "spain": "Spanish",
+    "india": "Hindi",
+    "japan": "Japanese",
+    "china": "Chinese",
+    "germany": "German",
+    "brazil": "Portuguese"
+}
+
 
 class CreativeAutomationPipeline:
+    # One composition per aspect ratio; product assets are generated
+    # up front on the event loop, outside the per-product pool
+    REQUESTS_PER_PRODUCT = len(CampaignComposer.ASPECT_RATIOS)
+
     def __init__(self):
         self.vertex_ai_service = VertexAIService()
         self.asset_manager = AssetManager(self.vertex_ai_service)
@@ -49,11 +64,23 @@ class CreativeAutomationPipeline:
         self.legal_checker = LegalChecker()
         self.reporter = Reporter()
         self.dropbox_uploader = DropboxUploader()
+        # The genai async client keeps connections bound to the loop that opened
+        # them, so every run in this process reuses one long-lived loop
+        self._loop = asyncio.new_event_loop()
+
+    def close(self):
+        """
+        Shut down the pipeline's event loop
+        Summary: Call once after the last run; the pipeline cannot run again afterwards
+        """
+        self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        self._loop.close()
 
     def run(self, campaign_brief_path: Path) -> bool:
         start_time = time.time()
         errors = []
         all_outputs: List[CampaignOutput] = []
+        upload_queue: List[Tuple[str, List[Path]]] = []
 
         try:
             campaign_brief = self._load_campaign_brief(campaign_brief_path)
@@ -70,82 +97,49 @@ class CreativeAutomationPipeline:
                 errors.append(error_msg)
                 return False
 
-            translated_message = self.vertex_ai_service.translate_message(
-                message=campaign_brief.campaign_message,
-                region=campaign_brief.region,
-                target_audience=campaign_brief.target_audience
+            # Translation and missing product assets don't depend on each other
+            translated_message, translated_legal_result, product_assets = self._loop.run_until_complete(
+                self._translate_and_prepare_assets(campaign_brief)
             )
 
-            translated_legal_result = self.legal_checker.check_content(
-                campaign_brief.campaign_message,
-                translated_message
-            )
-
-            for product in campaign_brief.products:
-                logger.info(f"Processing: {product.name}")
+            # Stop before spending composition quota on blocked translations
+            if translated_legal_result.blocked:
+                error_msg = f"Campaign blocked after translation: {translated_legal_result.details}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+                return False
 
-                try:
-                    # Get or generate product asset
-                    product_asset_path, asset_generated = self.asset_manager.get_or_create_asset(
-                        product=product,
-                        brand_theme=campaign_brief.brand.theme
-                    )
+            language = self._get_language_from_region(campaign_brief.region)
+            brand_logo_path = Path(campaign_brief.brand.logo_path)
 
-                    if not product_asset_path:
-                        error_msg = f"Failed to obtain asset for {product.name}"
-                        logger.error(error_msg)
-                        errors.append(error_msg)
-                        continue
+            # Products are independent and dominated by network-bound API calls
+            max_workers = max(1, min(
+                len(campaign_brief.products),
+                get_settings().imagen_rpm_limit // self.REQUESTS_PER_PRODUCT
+            ))
 
-                    # Compose campaigns for all aspect ratios
-                    campaign_outputs = self.campaign_composer.compose_campaigns(
-                        campaign_id=campaign_brief.campaign_id,
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._process_product,
                         product=product,
-                        product_asset_path=product_asset_path,
-                        brand=campaign_brief.brand,
-                        original_message=campaign_brief.campaign_message,
+                        product_asset=product_asset,
+                        campaign_brief=campaign_brief,
                         translated_message=translated_message,
-                        language=self._get_language_from_region(campaign_brief.region),
-                        asset_was_generated=asset_generated
+                        legal_flags=translated_legal_result.prohibited_words_found,
+                        language=language,
+                        brand_logo_path=brand_logo_path
                     )
+                    for product, product_asset in zip(campaign_brief.products, product_assets)
+                ]
 
-                    # Perform compliance and legal checks on generated campaigns
-                    for campaign_output in campaign_outputs:
-                        # Brand compliance check
-                        compliance_result = self.compliance_checker.check_compliance(
-                            campaign_asset_path=Path(campaign_output.output_path),
-                            brand=campaign_brief.brand
-                        )
-
-                        campaign_output.compliance_passed = compliance_result.passed
-                        campaign_output.legal_flags = translated_legal_result.prohibited_words_found
-
-                        if not compliance_result.passed:
-                            logger.warning(
-                                f"COMPLIANCE FAILED | Product: {campaign_output.product_name} | "
-                                f"Aspect: {campaign_output.aspect_ratio} | "
-                                f"Violations: {', '.join(compliance_result.violations)}"
-                            )
-
-                    all_outputs.extend(campaign_outputs)
-
-                    # Upload to Dropbox if enabled
-                    if settings.dropbox_upload_enabled:
-                        asset_paths = [Path(output.output_path) for output in campaign_outputs]
-                        if product_asset_path.exists():
-                            asset_paths.insert(0, product_asset_path)
-
-                        self.dropbox_uploader.upload_campaign_assets(
-                            campaign_id=campaign_brief.campaign_id,
-                            product_name=product.name,
-                            asset_paths=asset_paths
-                        )
-
-                except Exception as e:
-                    error_msg = f"Error processing product {product.name}: {str(e)}"
-                    logger.error(error_msg, exc_info=True)
-                    errors.append(error_msg)
-                    continue
+                # Collect in brief order so reports stay deterministic
+                for product, future in zip(campaign_brief.products, futures):
+                    product_outputs, product_errors, asset_paths = future.result()
+                    all_outputs.extend(product_outputs)
+                    errors.extend(product_errors)
+                    if asset_paths:
+                        upload_queue.append((product.name, asset_paths))
 
             total_time = time.time() - start_time
             report_path = self.reporter.generate_report(
@@ -155,10 +149,11 @@ class CreativeAutomationPipeline:
                 errors=errors
             )
 
-            # Upload report to Dropbox if enabled
-            if settings.dropbox_upload_enabled:
-                self.dropbox_uploader.upload_report(
+            # Upload all assets and the report to Dropbox in one batch if enabled
+            if get_settings().dropbox_upload_enabled:
+                self.dropbox_uploader.upload_campaign_batch(
                     campaign_id=campaign_brief.campaign_id,
+                    upload_queue=upload_queue,
                     report_path=report_path
                 )
 
@@ -170,13 +165,138 @@ class CreativeAutomationPipeline:
             return False
 
         except Exception as e:
-            logger.error(f"Pipeline execution failed: {e}", exc_info=True)
+            logger.error("Pipeline execution failed: %s", e, exc_info=True)
             return False
 
+    async def _translate_and_prepare_assets(
+        self,
+        campaign_brief: CampaignBrief
+    ) -> Tuple[str, LegalCheckResult, Optional[List[Tuple[Optional[Path], bool]]]]:
+        """
+        Translate and legally check the campaign message while product assets are fetched or generated
+        Summary: Returns the translated message, its legal check result and one (asset path, was generated) pair per product in brief order, or None for the assets when the translation is blocked
+        """
+        asset_tasks = [
+            asyncio.ensure_future(self.asset_manager.aget_or_create_asset(
+                product=product,
+                brand_theme=campaign_brief.brand.theme
+            ))
+            for product in campaign_brief.products
+        ]
+
+        try:
+            translated_message = await self.vertex_ai_service.atranslate_message(
+                message=campaign_brief.campaign_message,
+                region=campaign_brief.region,
+                target_audience=campaign_brief.target_audience
+            )
+
+            translated_legal_result = self.legal_checker.check_content(
+                campaign_brief.campaign_message,
+                translated_message
+            )
+        except BaseException:
+            for task in asset_tasks:
+                task.cancel()
+            raise
+
+        # Don't spend Imagen quota on a campaign that will be blocked; generations
+        # already in flight can't be recalled, but queued ones are dropped
+        if translated_legal_result.blocked:
+            for task in asset_tasks:
+                task.cancel()
+            await asyncio.gather(*asset_tasks, return_exceptions=True)
+            return translated_message, translated_legal_result, None
+
+        product_assets = await asyncio.gather(*asset_tasks)
+        return translated_message, translated_legal_result, list(product_assets)
+
+    def _process_product(
+        self,
+        product: Product,
+        product_asset: Tuple[Optional[Path], bool],
+        campaign_brief: CampaignBrief,
+        translated_message: str,
+        legal_flags: List[str],
+        language: str,
+        brand_logo_path: Path
+    ) -> Tuple[List[CampaignOutput], List[str], List[Path]]:
+        errors = []
+        logger.info("Processing: %s", product.name)
+
+        try:
+            # Asset was fetched or generated alongside the translation
+            product_asset_path, asset_generated = product_asset
+
+            if not product_asset_path:
+                error_msg = f"Failed to obtain asset for {product.name}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+                return [], errors, []
+
+            # Compose campaigns for all aspect ratios
+            composed = self.campaign_composer.compose_campaigns(
+                campaign_id=campaign_brief.campaign_id,
+                product=product,
+                product_asset_path=product_asset_path,
+                brand=campaign_brief.brand,
+                brand_logo_path=brand_logo_path,
+                original_message=campaign_brief.campaign_message,
+                translated_message=translated_message,
+                language=language,
+                asset_was_generated=asset_generated
+            )
+
+            # Perform compliance and legal checks on generated campaigns
+            campaign_outputs = []
+            output_paths = []
+            for campaign_output, rendered_rgb in composed:
+                output_path = Path(campaign_output.output_path)
+                campaign_outputs.append(campaign_output)
+                output_paths.append(output_path)
+
+                # Brand compliance check on the in-memory render
+                compliance_result = self.compliance_checker.check_compliance(
+                    campaign_asset_path=output_path,
+                    brand=campaign_brief.brand,
+                    logo_path=brand_logo_path,
+                    precomputed_rgb=rendered_rgb
+                )
+
+                campaign_output.compliance_passed = compliance_result.passed
+                campaign_output.legal_flags = legal_flags
+
+                if not compliance_result.passed:
+                    logger.warning(
+                        "COMPLIANCE FAILED | Product: %s | Aspect: %s | Violations: %s",
+                        campaign_output.product_name,
+                        campaign_output.aspect_ratio,
+                        ', '.join(compliance_result.violations)
+                    )
+
+            # Queue assets for the campaign-wide Dropbox upload
+            # (aget_or_create_asset only returns paths that exist)
+            asset_paths = []
+            if get_settings().dropbox_upload_enabled:
+                asset_paths = [product_asset_path] + output_paths
+
+            return campaign_outputs, errors, asset_paths
+
+        except Exception as e:
+            error_msg = f"Error processing product {product.name}: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            errors.append(error_msg)
+            return [], errors, []
+
     def _load_campaign_brief(self, path: Path) -> CampaignBrief:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if orjson is not None:
+                # orjson parses raw bytes directly, skipping the UTF-8 decode step
+                with open(path, 'rb') as f:
+                    data = orjson.loads(f.read())
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
 
             campaign_brief = CampaignBrief(**data)
             return campaign_brief
@@ -194,19 +314,36 @@ class CreativeAutomationPipeline:
             raise
 
     def _get_language_from_region(self, region: str) -> str:
-        language_map = {
-            "quebec": "French",
-            "france": "French",
-            "mexico": "Spanish",
-            "spain": "Spanish",
-            "india": "Hindi",
-            "japan": "Japanese",
-            "china": "Chinese",
-            "germany": "German",
-            "brazil": "Portuguese"
-        }
+        return _LANGUAGE_MAP.get(region.lower(), "English")
+
+
+def configure_logging() -> logging.handlers.QueueListener:
+    """
+    Route all log records through a queue to stdout and the log file
+    Summary: Worker threads only enqueue records; a background listener does the writes
+    """
+    formatter = logging.Formatter('%(levelname)s: %(message)s')
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
 
-        return language_map.get(region.lower(), "English")
+    file_handler = logging.FileHandler('creative_automation.log')
+    file_handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, get_settings().log_level))
+    root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        stream_handler,
+        file_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+    return listener
 
 
 def main():
@@ -215,16 +352,26 @@ def main():
         print("Example: python main.py data/campaign_brief.json")
         sys.exit(1)
 
-    campaign_brief_path = Path(sys.argv[1])
+    listener = configure_logging()
 
-    if not campaign_brief_path.exists():
-        logger.error(f"Campaign brief file not found: {campaign_brief_path}")
-        sys.exit(1)
+    try:
+        campaign_brief_path = Path(sys.argv[1])
+
+        if not campaign_brief_path.exists():
+            logger.error(f"Campaign brief file not found: {campaign_brief_path}")
+            sys.exit(1)
+
+        pipeline = CreativeAutomationPipeline()
+        try:
+            success = pipeline.run(campaign_brief_path)
+        finally:
+            pipeline.close()
 
-    pipeline = CreativeAutomationPipeline()
-    success = pipeline.run(campaign_brief_path)
+        sys.exit(0 if success else 1)
 
-    sys.exit(0 if success else 1)
+    finally:
+        # Drain queued records before the process exits
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -2,9 +2,10 @@ import logging
 from pathlib import Path
 from typing import Optional
 
-from config import settings
+from config import get_settings
 from schemas.campaign import Product
 from modules.vertex_ai_service import VertexAIService as GeminiService
+from modules.utils import safe_name
 
 logger = logging.getLogger(__name__)
 
@@ -12,28 +13,41 @@ logger = logging.getLogger(__name__)
 class AssetManager:
     def __init__(self, gemini_service: GeminiService):
         self.gemini_service = gemini_service
-        self.products_dir = settings.assets_dir / "products"
+        self.products_dir = get_settings().assets_dir / "products"
         self.products_dir.mkdir(exist_ok=True)
 
-    def get_or_create_asset(
+    def _resolve_existing_asset(self, product: Product) -> tuple[Optional[Path], Path]:
+        """
+        Look up a product asset already on disk
+        Summary: Returns (existing path or None, path a generated asset should be written to)
+        """
+        if product.asset_path:
+            asset_path = get_settings().assets_dir / product.asset_path
+            if asset_path.exists():
+                return asset_path, asset_path
+
+        output_path = self.products_dir / f"{safe_name(product.name).lower()}.png"
+
+        if output_path.exists():
+            return output_path, output_path
+
+        return None, output_path
+
+    async def aget_or_create_asset(
         self,
         product: Product,
         brand_theme: str
     ) -> tuple[Optional[Path], bool]:
+        """
+        Return an existing product asset or generate a missing one
+        Summary: Lets the pipeline generate missing assets concurrently with translation
+        """
         try:
-            if product.asset_path:
-                asset_path = settings.assets_dir / product.asset_path
-                if asset_path.exists():
-                    return asset_path, False
+            existing_path, output_path = self._resolve_existing_asset(product)
+            if existing_path:
+                return existing_path, False
 
-            safe_name = "".join(c if c.isalnum() or c in "_ " else "_" for c in product.name)
-            safe_name = safe_name.replace(" ", "_").lower()
-            output_path = self.products_dir / f"{safe_name}.png"
-
-            if output_path.exists():
-                return output_path, False
-
-            success = self.gemini_service.generate_product_asset(
+            success = await self.gemini_service.agenerate_product_asset(
                 product_name=product.name,
                 product_description=product.description,
                 brand_theme=brand_theme,
@@ -43,9 +57,9 @@ class AssetManager:
             if success:
                 return output_path, True
 
-            logger.error(f"Failed to generate asset: {product.name}")
+            logger.error("Failed to generate asset: %s", product.name)
             return None, False
 
         except Exception as e:
-            logger.error(f"Asset error: {e}")
-            return None, False
\ No newline at end of file
+            logger.error("Asset error: %s", e)
+            return None, False
@@ -4,18 +4,81 @@ Summary: Validates campaign assets for logo presence and brand color usage
 """
 
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import cv2
 import numpy as np
-from PIL import Image
 from sklearn.cluster import KMeans
 
+try:
+    import numba
+except ImportError:  # Optional JIT for the color match kernel
+    numba = None
+
 from schemas.campaign import Brand, ComplianceResult
 
 logger = logging.getLogger(__name__)
 
 
+if numba is not None:
+    # Serial on purpose: chunks are small, and the checker is called from several
+    # product threads at once, which Numba's workqueue threading layer cannot handle
+    @numba.njit(fastmath=True, cache=True)
+    def _count_box_matches(pixels: np.ndarray, tr: int, tg: int, tb: int, tolerance: int) -> int:
+        """
+        Count pixels within a Chebyshev distance of the target color
+        Summary: Fused abs/compare/sum over (N, 3) uint8 pixels without temporaries
+        """
+        count = 0
+        for i in range(pixels.shape[0]):
+            if (
+                abs(int(pixels[i, 0]) - tr) <= tolerance
+                and abs(int(pixels[i, 1]) - tg) <= tolerance
+                and abs(int(pixels[i, 2]) - tb) <= tolerance
+            ):
+                count += 1
+        return count
+else:
+    _count_box_matches = None
+
+
+@lru_cache(maxsize=8)
+def _load_logo_gray(logo_path: str, mtime: float) -> Optional[np.ndarray]:
+    """
+    Load brand logo as grayscale template
+    Summary: Cached per path and modification time, so the same logo is decoded once per run
+    """
+    logo_img = cv2.imread(logo_path)
+    if logo_img is None:
+        return None
+    return cv2.cvtColor(logo_img, cv2.COLOR_BGR2GRAY)
+
+
+@lru_cache(maxsize=8)
+def _load_logo_pyramid(
+    logo_path: str,
+    mtime: float,
+    max_levels: int,
+    min_size: int
+) -> Optional[tuple[np.ndarray, ...]]:
+    """
+    Build Gaussian pyramid of the grayscale logo template
+    Summary: Full-resolution template first, then each pyrDown level whose sides stay >= min_size
+    """
+    logo_gray = _load_logo_gray(logo_path, mtime)
+    if logo_gray is None:
+        return None
+
+    pyramid = [logo_gray]
+    for _ in range(max_levels):
+        if min(pyramid[-1].shape[:2]) < 2 * min_size:
+            break
+        pyramid.append(cv2.pyrDown(pyramid[-1]))
+
+    return tuple(pyramid)
+
+
 class BrandComplianceChecker:
     """Checks campaign assets for brand compliance"""
 
@@ -25,23 +88,53 @@ class BrandComplianceChecker:
         """
         self.logo_match_threshold = 0.7
         self.color_presence_threshold = 0.001  # 0.1% of pixels
+        self.color_sample_scale = 0.25  # Downsample factor for color checks
+        self.color_chunk_size = 4096  # Pixels per interleaved early-exit step (~16 steps on a 256x256 sample)
+        self.color_early_exit_margin = 1.5  # Stop once matches exceed margin x threshold
+        self.logo_pyramid_levels = 2  # Coarse levels for logo matching
+        self.logo_refine_margin = 0.1  # Refine coarse matches scoring at least threshold - margin
+        self.min_logo_template_size = 16  # Smallest template side at coarse levels
 
     def check_compliance(
         self,
         campaign_asset_path: Path,
-        brand: Brand
+        brand: Brand,
+        logo_path: Optional[Path] = None,
+        precomputed_rgb: Optional[np.ndarray] = None
     ) -> ComplianceResult:
         """
         Perform comprehensive brand compliance check
-        Summary: Checks logo presence and brand color usage in campaign asset
+        Summary: Checks logo presence and brand color usage in campaign asset; pass precomputed_rgb to skip decoding the file
         """
         violations = []
 
         try:
+            # Decode the asset once (unless already in memory) and share it across all checks
+            campaign_rgb = precomputed_rgb
+            if campaign_rgb is None:
+                campaign_bgr = cv2.imread(str(campaign_asset_path))
+                if campaign_bgr is None:
+                    raise ValueError(f"Failed to load campaign asset: {campaign_asset_path}")
+                campaign_rgb = cv2.cvtColor(campaign_bgr, cv2.COLOR_BGR2RGB)
+
+            campaign_gray = cv2.cvtColor(campaign_rgb, cv2.COLOR_RGB2GRAY)
+
+            # Color percentages are estimated on an area-averaged sample
+            color_sample = campaign_rgb
+            if min(campaign_rgb.shape[:2]) * self.color_sample_scale >= 1:
+                color_sample = cv2.resize(
+                    campaign_rgb,
+                    (0, 0),
+                    fx=self.color_sample_scale,
+                    fy=self.color_sample_scale,
+                    interpolation=cv2.INTER_AREA
+                )
+            campaign_pixels = color_sample.reshape(-1, 3)
+
             # Check logo presence
             logo_detected, logo_confidence = self._detect_logo(
-                campaign_asset_path,
-                Path(brand.logo_path)
+                campaign_gray,
+                logo_path or Path(brand.logo_path)
             )
 
             if not logo_detected:
@@ -49,12 +142,12 @@ class BrandComplianceChecker:
 
             # Check brand colors
             primary_present, primary_pct = self._check_color_presence(
-                campaign_asset_path,
+                campaign_pixels,
                 brand.primary_color
             )
 
             secondary_present, secondary_pct = self._check_color_presence(
-                campaign_asset_path,
+                campaign_pixels,
                 brand.secondary_color
             )
 
@@ -86,7 +179,7 @@ class BrandComplianceChecker:
             return result
 
         except Exception as e:
-            logger.error(f"Compliance check error: {e}")
+            logger.error("Compliance check error: %s", e)
             return ComplianceResult(
                 logo_detected=False,
                 logo_confidence=0.0,
@@ -100,91 +193,151 @@ class BrandComplianceChecker:
 
     def _detect_logo(
         self,
-        campaign_asset_path: Path,
+        campaign_gray: np.ndarray,
         logo_path: Path
     ) -> tuple[bool, float]:
         """
         Detect logo in campaign asset using template matching
-        Summary: Uses OpenCV template matching to find logo
+        Summary: Uses OpenCV template matching to find logo in the grayscale asset
         """
         try:
-            # Load images
-            campaign_img = cv2.imread(str(campaign_asset_path))
-            logo_img = cv2.imread(str(logo_path))
+            logo_pyramid = None
+            if logo_path.exists():
+                logo_pyramid = _load_logo_pyramid(
+                    str(logo_path),
+                    logo_path.stat().st_mtime,
+                    self.logo_pyramid_levels,
+                    self.min_logo_template_size
+                )
 
-            if campaign_img is None or logo_img is None:
+            if logo_pyramid is None:
                 logger.error("Failed to load images for logo detection")
                 return False, 0.0
 
-            # Convert to grayscale
-            campaign_gray = cv2.cvtColor(campaign_img, cv2.COLOR_BGR2GRAY)
-            logo_gray = cv2.cvtColor(logo_img, cv2.COLOR_BGR2GRAY)
+            # Template matching on a reduced Gaussian pyramid level first
+            logo_gray, coarse_logo = logo_pyramid[0], logo_pyramid[-1]
+            levels = len(logo_pyramid) - 1
+            coarse_campaign = campaign_gray
+            for _ in range(levels):
+                coarse_campaign = cv2.pyrDown(coarse_campaign)
+
+            confidence, location = self._match_template(coarse_campaign, coarse_logo)
+
+            # Promising coarse matches are refined at full resolution, but only
+            # in a small window around the coarse peak instead of the whole image
+            if levels and confidence >= self.logo_match_threshold - self.logo_refine_margin:
+                scale = 2 ** levels
+                pad = 2 * scale
+                logo_height, logo_width = logo_gray.shape[:2]
+                image_height, image_width = campaign_gray.shape[:2]
+
+                x0 = max(location[0] * scale - pad, 0)
+                y0 = max(location[1] * scale - pad, 0)
+                x1 = min(location[0] * scale + logo_width + pad, image_width)
+                y1 = min(location[1] * scale + logo_height + pad, image_height)
 
-            # Template matching
-            result = cv2.matchTemplate(campaign_gray, logo_gray, cv2.TM_CCOEFF_NORMED)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+                confidence, _ = self._match_template(campaign_gray[y0:y1, x0:x1], logo_gray)
 
-            confidence = float(max_val)
             detected = confidence >= self.logo_match_threshold
             return detected, confidence
 
         except Exception as e:
-            logger.error(f"Logo detection error: {e}")
+            logger.error("Logo detection error: %s", e)
             return False, 0.0
 
+    def _match_template(
+        self,
+        image_gray: np.ndarray,
+        template_gray: np.ndarray
+    ) -> tuple[float, tuple[int, int]]:
+        """
+        Run normalized template matching
+        Summary: Returns the best TM_CCOEFF_NORMED score of template in image and its top-left location
+        """
+        result = cv2.matchTemplate(image_gray, template_gray, cv2.TM_CCOEFF_NORMED)
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        return float(max_val), max_loc
+
     def _check_color_presence(
         self,
-        image_path: Path,
+        pixels: np.ndarray,
         hex_color: str
     ) -> tuple[bool, float]:
         """
         Check if brand color is present in image (checks shades before/after target color)
+        Summary: Expects flattened (N, 3) RGB pixels of the decoded asset
         """
         try:
-            # Load image
-            img = Image.open(image_path)
-            img_array = np.array(img.convert('RGB'))
-            pixels = img_array.reshape(-1, 3)
-
             # Convert hex to RGB
             target_rgb = self._hex_to_rgb(hex_color)
 
-            # Generate color range: lighter and darker shades
-            # Check 5 shades before (darker) and 5 after (lighter)
+            # Accept the target color plus 5 darker and 5 lighter shades.
+            # The union of those shade spheres is covered by a single box
+            # (Chebyshev distance) around the target, so one pass suffices.
             shade_range = 5
             shade_step = 15  # RGB value step for each shade
-
-            total_matching = 0
-
-            for i in range(-shade_range, shade_range + 1):
-                # Create shade variant
-                shade_rgb = np.clip(target_rgb + (i * shade_step), 0, 255).astype(int)
-
-                # Calculate color similarity for all pixels
-                distances = np.sqrt(np.sum((pixels - shade_rgb) ** 2, axis=1))
-
-                # Tolerance for matching (allow slight variations)
-                color_tolerance = 40
-                matching_pixels = np.sum(distances <= color_tolerance)
-                total_matching += matching_pixels
-
-            # Remove duplicates (same pixel counted multiple times)
-            # Use a more lenient approach - just sum all matches
-            total_pixels = len(pixels)
-
-            # Calculate percentage (capped at 100%)
-            percentage = min(total_matching / total_pixels, 1.0)
+            color_tolerance = 40  # Allow slight variations around each shade
+            max_distance = shade_range * shade_step + color_tolerance
+
+            early_exit_ratio = self.color_presence_threshold * self.color_early_exit_margin
+
+            # Scan interleaved chunks and stop once the color is clearly present.
+            # Each chunk takes every n-th pixel, so it samples the whole image
+            # rather than a band of rows, and the percentage estimated from the
+            # pixels scanned so far stays representative of the full asset
+            n_chunks = max(1, -(-len(pixels) // self.color_chunk_size))
+            matched = 0
+            scanned = 0
+            for offset in range(n_chunks):
+                chunk = np.ascontiguousarray(pixels[offset::n_chunks])
+                matched += self._count_color_matches(chunk, target_rgb, max_distance)
+                scanned += len(chunk)
+
+                if matched >= early_exit_ratio * scanned:
+                    break
+
+            percentage = matched / scanned if scanned else 0.0
             present = percentage >= self.color_presence_threshold
             return present, percentage
 
         except Exception as e:
-            logger.error(f"Color presence check error: {e}")
+            logger.error("Color presence check error: %s", e)
             return False, 0.0
 
-    def _hex_to_rgb(self, hex_color: str) -> np.ndarray:
+    def _count_color_matches(
+        self,
+        pixels: np.ndarray,
+        target_rgb: np.ndarray,
+        max_distance: int
+    ) -> int:
+        """
+        Count pixels within max_distance of target on every channel
+        Summary: Uses the Numba kernel when available, otherwise NumPy
+        """
+        if _count_box_matches is not None:
+            return _count_box_matches(
+                pixels,
+                int(target_rgb[0]),
+                int(target_rgb[1]),
+                int(target_rgb[2]),
+                max_distance
+            )
+
+        # inRange compares the uint8 pixels against clipped bounds directly,
+        # so no widened (int16/int64) copy of the pixel array is created
+        lower = tuple(int(c) for c in np.clip(target_rgb - max_distance, 0, 255))
+        upper = tuple(int(c) for c in np.clip(target_rgb + max_distance, 0, 255))
+        mask = cv2.inRange(pixels.reshape(-1, 1, 3), lower, upper)
+        return int(cv2.countNonZero(mask))
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _hex_to_rgb(hex_color: str) -> np.ndarray:
         """
         Convert hex color to RGB array
-        Summary: Converts #RRGGBB to numpy array [R, G, B]
+        Summary: Converts #RRGGBB to read-only numpy array [R, G, B], cached per color
         """
         hex_color = hex_color.lstrip('#')
-        return np.array([int(hex_color[i:i+2], 16) for i in (0, 2, 4)])
+        rgb = np.array([int(hex_color[i:i+2], 16) for i in (0, 2, 4)], dtype=np.int16)
+        rgb.flags.writeable = False
+        return rgb
@@ -4,13 +4,18 @@ Summary: Orchestrates campaign asset generation across multiple aspect ratios
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import time
 
-from config import settings
+import numpy as np
+
+from config import get_settings
 from schemas.campaign import Product, Brand, CampaignOutput
 from modules.vertex_ai_service import VertexAIService as GeminiService
+from modules.utils import safe_name
 
 logger = logging.getLogger(__name__)
 
@@ -35,19 +40,15 @@ class CampaignComposer:
         original_message: str,
         translated_message: str,
         language: str,
-        asset_was_generated: bool
-    ) -> List[CampaignOutput]:
+        asset_was_generated: bool,
+        brand_logo_path: Optional[Path] = None
+    ) -> List[Tuple[CampaignOutput, np.ndarray]]:
         """
         Generate campaign assets for all aspect ratios
-        Summary: Creates 3 campaign variations (1:1, 9:16, 16:9) for single product
+        Summary: Creates 3 campaign variations (1:1, 9:16, 16:9) for single product, each paired with its RGB pixels
         """
-        results = []
-
         # Create output directory for this product
-        safe_product_name = "".join(c if c.isalnum() or c in "_ " else "_" for c in product.name)
-        safe_product_name = safe_product_name.replace(" ", "_")
-
-        output_dir = settings.output_dir / campaign_id / safe_product_name
+        output_dir = get_settings().output_dir / campaign_id / safe_name(product.name)
         output_dir.mkdir(parents=True, exist_ok=True)
 
         brand_colors = {
@@ -55,50 +56,90 @@ class CampaignComposer:
             "secondary": brand.secondary_color
         }
 
-        brand_logo_path = Path(brand.logo_path)
+        if brand_logo_path is None:
+            brand_logo_path = Path(brand.logo_path)
+
+        compose_one = partial(
+            self._compose_one,
+            campaign_id=campaign_id,
+            product=product,
+            product_asset_path=product_asset_path,
+            brand=brand,
+            brand_colors=brand_colors,
+            brand_logo_path=brand_logo_path,
+            original_message=original_message,
+            translated_message=translated_message,
+            language=language,
+            asset_was_generated=asset_was_generated,
+            output_dir=output_dir
+        )
+
+        # Aspect ratios share no state, so their API calls run concurrently;
+        # the service semaphore still bounds total in-flight requests
+        with ThreadPoolExecutor(max_workers=len(self.ASPECT_RATIOS)) as executor:
+            results = [result for result in executor.map(compose_one, self.ASPECT_RATIOS) if result is not None]
 
-        for aspect_ratio in self.ASPECT_RATIOS:
-            try:
-                start_time = time.time()
-                ratio_filename = aspect_ratio.replace(":", "x") + ".png"
-                output_path = output_dir / ratio_filename
-
-                logger.info(f"Generating: {product.name} | Aspect: {aspect_ratio} | Output: {ratio_filename}")
+        return results
 
-                success = self.gemini_service.compose_campaign_asset(
-                    product_asset_path=product_asset_path,
-                    brand_logo_path=brand_logo_path,
-                    original_message=original_message,
-                    translated_message=translated_message,
-                    brand_colors=brand_colors,
-                    brand_font=brand.font_name,
-                    brand_domain=brand.domain,
+    def _compose_one(
+        self,
+        aspect_ratio: str,
+        campaign_id: str,
+        product: Product,
+        product_asset_path: Path,
+        brand: Brand,
+        brand_colors: Dict[str, str],
+        brand_logo_path: Path,
+        original_message: str,
+        translated_message: str,
+        language: str,
+        asset_was_generated: bool,
+        output_dir: Path
+    ) -> Optional[Tuple[CampaignOutput, np.ndarray]]:
+        """
+        Generate campaign asset for a single aspect ratio
+        Summary: Returns the campaign output and its RGB pixels, or None if composition failed
+        """
+        try:
+            start_time = time.time()
+            ratio_filename = aspect_ratio.replace(":", "x") + ".png"
+            output_path = output_dir / ratio_filename
+
+            logger.info("Generating: %s | Aspect: %s | Output: %s", product.name, aspect_ratio, ratio_filename)
+
+            rendered_rgb = self.gemini_service.compose_campaign_asset(
+                product_asset_path=product_asset_path,
+                brand_logo_path=brand_logo_path,
+                original_message=original_message,
+                translated_message=translated_message,
+                brand_colors=brand_colors,
+                brand_font=brand.font_name,
+                brand_domain=brand.domain,
+                aspect_ratio=aspect_ratio,
+                output_path=output_path,
+                product_description=product.description
+            )
+
+            generation_time = time.time() - start_time
+
+            if rendered_rgb is not None:
+                campaign_output = CampaignOutput(
+                    campaign_id=campaign_id,
+                    product_name=product.name,
                     aspect_ratio=aspect_ratio,
-                    output_path=output_path,
-                    product_description=product.description
+                    output_path=str(output_path),
+                    language=language,
+                    translated_message=translated_message,
+                    asset_generated=asset_was_generated,
+                    compliance_passed=False,
+                    legal_flags=[],
+                    generation_time_seconds=generation_time
                 )
+                return campaign_output, rendered_rgb
 
-                generation_time = time.time() - start_time
-
-                if success:
-                    campaign_output = CampaignOutput(
-                        campaign_id=campaign_id,
-                        product_name=product.name,
-                        aspect_ratio=aspect_ratio,
-                        output_path=str(output_path),
-                        language=language,
-                        translated_message=translated_message,
-                        asset_generated=asset_was_generated,
-                        compliance_passed=False,
-                        legal_flags=[],
-                        generation_time_seconds=generation_time
-                    )
-                    results.append(campaign_output)
-                else:
-                    logger.error(f"Failed: {product.name} | Aspect: {aspect_ratio}")
-
-            except Exception as e:
-                logger.error(f"Composition error ({aspect_ratio}): {e}")
-                continue
+            logger.error("Failed: %s | Aspect: %s", product.name, aspect_ratio)
+            return None
 
-        return results
+        except Exception as e:
+            logger.error("Composition error (%s): %s", aspect_ratio, e)
+            return None
@@ -4,13 +4,22 @@ Summary: Uploads campaign assets to Dropbox cloud storage
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterator, Optional, List, Tuple, Set
 import dropbox
 from dropbox.exceptions import ApiError, AuthError
-from dropbox.files import WriteMode
+from dropbox.files import (
+    WriteMode,
+    CommitInfo,
+    UploadSessionCursor,
+    UploadSessionFinishArg,
+    UploadSessionType,
+)
 
-from config import settings
+from config import get_settings
+from modules.utils import safe_name
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +27,20 @@ logger = logging.getLogger(__name__)
 class DropboxUploader:
     """Uploads campaign assets to Dropbox"""
 
+    BATCH_MAX_FILE_SIZE = 150 * 1024 * 1024  # Largest single-request session upload
+    BATCH_MAX_ENTRIES = 1000  # Dropbox limit per finish_batch call
+    CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024  # Larger files upload in chunks
+    UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024  # Multiple of 4MiB, required for concurrent sessions
+    UPLOAD_CHUNK_WORKERS = 4
+
     def __init__(self):
         """
         Initialize Dropbox uploader
         """
+        settings = get_settings()
         self.enabled = settings.dropbox_upload_enabled
         self.base_path = settings.dropbox_base_path.rstrip('/')
+        self.upload_concurrency = max(1, settings.dropbox_upload_concurrency)
 
         if self.enabled:
             if not settings.dropbox_access_token:
@@ -45,6 +62,14 @@ class DropboxUploader:
         else:
             self.dbx = None
 
+    def _join_path(self, *parts: str) -> str:
+        """
+        Build a full Dropbox path under base_path
+        Summary: Joins non-empty parts with single slashes, so no follow-up '//' replace is needed
+        """
+        stripped = (part.strip('/') for part in parts)
+        return "/".join([self.base_path, *(part for part in stripped if part)])
+
     def upload_file(self, local_path: Path, dropbox_path: str) -> Optional[str]:
         """
         Upload single file to Dropbox
@@ -53,40 +78,298 @@ class DropboxUploader:
         if not self.enabled:
             return None
 
+        full_path = self._join_path(dropbox_path)
+
+        if not self._upload_bytes(local_path, full_path):
+            return None
+
+        return self._get_shared_link(full_path)
+
+    def _upload_bytes(self, local_path: Path, full_path: str) -> bool:
+        """
+        Upload file contents to an absolute Dropbox path
+        Summary: Writes the file without creating a shared link, returns success
+        """
         try:
+            file_size = local_path.stat().st_size
+            if file_size > self.CHUNKED_UPLOAD_THRESHOLD:
+                self._upload_chunked(local_path, full_path, file_size)
+                return True
+
             with open(local_path, 'rb') as f:
                 file_data = f.read()
 
-            full_path = f"{self.base_path}/{dropbox_path}".replace('//', '/')
-
             self.dbx.files_upload(
                 file_data,
                 full_path,
                 mode=WriteMode('overwrite'),
                 autorename=False
             )
-
-            try:
-                shared_link = self.dbx.sharing_create_shared_link_with_settings(full_path)
-                return shared_link.url
-            except ApiError as e:
-                if 'shared_link_already_exists' in str(e):
-                    links = self.dbx.sharing_list_shared_links(path=full_path)
-                    if links.links:
-                        return links.links[0].url
-                logger.warning(f"Could not create shared link for {full_path}")
-                return None
+            return True
 
         except FileNotFoundError as e:
             logger.error(f"Dropbox upload failed - File not found: {local_path}")
-            return None
+            return False
         except PermissionError as e:
             logger.error(f"Dropbox upload failed - Permission denied: {local_path}")
+            return False
+        except Exception as e:
+            logger.error(f"Dropbox upload failed for {local_path}: {type(e).__name__}: {e}")
+            return False
+
+    def _upload_chunked(self, local_path: Path, full_path: str, file_size: int):
+        """
+        Upload large file through a concurrent upload session
+        Summary: Appends fixed-size chunks in parallel, reading each from disk on demand, then commits
+        """
+        session = self.dbx.files_upload_session_start(b'', session_type=UploadSessionType.concurrent)
+        offsets = list(range(0, file_size, self.UPLOAD_CHUNK_SIZE))
+        last_offset = offsets[-1]
+
+        def append_chunk(offset: int):
+            with open(local_path, 'rb') as f:
+                f.seek(offset)
+                chunk = f.read(self.UPLOAD_CHUNK_SIZE)
+
+            self.dbx.files_upload_session_append_v2(
+                chunk,
+                UploadSessionCursor(session_id=session.session_id, offset=offset),
+                close=offset == last_offset
+            )
+
+        with ThreadPoolExecutor(max_workers=self.UPLOAD_CHUNK_WORKERS) as executor:
+            # Consuming the results re-raises the first failed append
+            list(executor.map(append_chunk, offsets))
+
+        self.dbx.files_upload_session_finish(
+            b'',
+            UploadSessionCursor(session_id=session.session_id, offset=file_size),
+            CommitInfo(path=full_path, mode=WriteMode('overwrite'), autorename=False)
+        )
+
+    def _get_shared_link(self, full_path: str) -> Optional[str]:
+        """
+        Get shared link for uploaded file
+        Summary: Creates a shared link, reusing the existing one if already shared
+        """
+        try:
+            shared_link = self.dbx.sharing_create_shared_link_with_settings(full_path)
+            return shared_link.url
+        except ApiError as e:
+            if 'shared_link_already_exists' in str(e):
+                return self._get_existing_shared_link(full_path, e)
+            logger.warning(f"Could not create shared link for {full_path}")
             return None
+        except Exception as e:
+            logger.warning(f"Could not create shared link for {full_path}: {type(e).__name__}: {e}")
+            return None
+
+    def _get_existing_shared_link(self, full_path: str, conflict: ApiError) -> Optional[str]:
+        """
+        Look up the shared link that already exists for a file
+        Summary: Never raises, so a failed lookup only leaves this one file without a link
+        """
+        try:
+            # The conflict error usually carries the existing link, saving a list call
+            existing = conflict.error.get_shared_link_already_exists()
+            if existing is not None and existing.is_metadata():
+                return existing.get_metadata().url
+
+            links = self.dbx.sharing_list_shared_links(path=full_path)
+            if links.links:
+                return links.links[0].url
+        except Exception as e:
+            logger.warning(f"Could not fetch existing shared link for {full_path}: {type(e).__name__}: {e}")
+            return None
+
+        logger.warning(f"Could not create shared link for {full_path}")
+        return None
+
+    def _upload_batch(self, items: List[Tuple[Path, str]]) -> Set[str]:
+        """
+        Upload several files with a single batch commit
+        Summary: Starts one closed upload session per file, commits them with finish_batch_v2, returns committed Dropbox paths
+        """
+        committed = set()
+
+        # Session uploads are independent, so only the final commit is serialized
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as executor:
+            futures = [
+                executor.submit(self._start_upload_session, local_path, full_path)
+                for local_path, full_path in items
+            ]
+            entries = [future.result() for future in futures]
+
+        entries = [entry for entry in entries if entry is not None]
+
+        for start in range(0, len(entries), self.BATCH_MAX_ENTRIES):
+            chunk = entries[start:start + self.BATCH_MAX_ENTRIES]
+
+            try:
+                result = self.dbx.files_upload_session_finish_batch_v2([arg for _, arg in chunk])
+            except Exception as e:
+                logger.error(f"Dropbox batch commit failed: {type(e).__name__}: {e}")
+                continue
+
+            for (full_path, _), entry in zip(chunk, result.entries):
+                if entry.is_success():
+                    committed.add(full_path)
+                else:
+                    logger.error(f"Dropbox batch commit failed for {full_path}: {entry.get_failure()}")
+
+        return committed
+
+    def _start_upload_session(
+        self,
+        local_path: Path,
+        full_path: str
+    ) -> Optional[Tuple[str, UploadSessionFinishArg]]:
+        """
+        Upload file contents into a closed upload session
+        Summary: Returns the Dropbox path and finish argument for a later batch commit, or None on failure
+        """
+        try:
+            # Stream the file in chunks so at most one chunk is held in memory;
+            # the SDK only accepts bytes bodies, so reads cannot be zero-copy
+            with open(local_path, 'rb') as f:
+                chunk = f.read(self.UPLOAD_CHUNK_SIZE)
+                next_chunk = f.read(self.UPLOAD_CHUNK_SIZE)
+
+                session = self.dbx.files_upload_session_start(chunk, close=not next_chunk)
+                offset = len(chunk)
+
+                while next_chunk:
+                    chunk = next_chunk
+                    next_chunk = f.read(self.UPLOAD_CHUNK_SIZE)
+
+                    self.dbx.files_upload_session_append_v2(
+                        chunk,
+                        UploadSessionCursor(session_id=session.session_id, offset=offset),
+                        close=not next_chunk
+                    )
+                    offset += len(chunk)
+
+            return full_path, UploadSessionFinishArg(
+                cursor=UploadSessionCursor(session_id=session.session_id, offset=offset),
+                commit=CommitInfo(path=full_path, mode=WriteMode('overwrite'), autorename=False)
+            )
+
         except Exception as e:
             logger.error(f"Dropbox upload failed for {local_path}: {type(e).__name__}: {e}")
             return None
 
+    def _upload_items(self, items: List[Tuple[Path, str]]) -> Tuple[dict, List[str]]:
+        """
+        Upload files, batching the small ones into a single commit
+        Summary: Returns uploaded local path -> shared link mapping and the list of failed local paths
+        """
+        uploaded = {}
+        failed = []
+
+        # Resolve each full Dropbox path once for the upload, commit and link steps
+        items = [(local_path, self._join_path(dropbox_path)) for local_path, dropbox_path in items]
+
+        # Files too large for a single session request are uploaded individually
+        batch_items = []
+        large_items = []
+        for local_path, full_path in items:
+            if local_path.stat().st_size > self.BATCH_MAX_FILE_SIZE:
+                large_items.append((local_path, full_path))
+            else:
+                batch_items.append((local_path, full_path))
+
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as executor:
+            large_futures = {
+                executor.submit(self._upload_bytes, local_path, full_path): full_path
+                for local_path, full_path in large_items
+            }
+
+            committed = self._upload_batch(batch_items)
+
+            for future in as_completed(large_futures):
+                if future.result():
+                    committed.add(large_futures[future])
+
+        # Shared links are independent metadata calls, so create them concurrently
+        # once every upload has landed
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as executor:
+            link_futures = {}
+            for local_path, full_path in items:
+                if full_path in committed:
+                    link_futures[executor.submit(self._get_shared_link, full_path)] = local_path
+                else:
+                    logger.error(f"Dropbox upload failed for asset: {local_path.name}")
+                    failed.append(str(local_path))
+
+            for future in as_completed(link_futures):
+                local_path = link_futures[future]
+                url = future.result()
+
+                if url:
+                    uploaded[str(local_path)] = url
+                else:
+                    logger.error(f"Dropbox upload failed for asset: {local_path.name}")
+                    failed.append(str(local_path))
+
+        return uploaded, failed
+
+    def upload_campaign_batch(
+        self,
+        campaign_id: str,
+        upload_queue: List[Tuple[str, List[Path]]],
+        report_path: Optional[Path] = None,
+        delete_existing: bool = True
+    ) -> dict:
+        """
+        Upload assets for every product in a campaign, plus the report
+        Summary: Prepares product folders, then commits all files in one upload session batch instead of per product
+        """
+        if not self.enabled:
+            logger.warning(f"`self.enabled` is False in upload_campaign_batch. Update to True to enable Dropbox uploads.")
+            return {}
+
+        uploaded = {}
+        failed = []
+        items = []
+
+        for product_name, asset_paths in upload_queue:
+            campaign_folder = f"{campaign_id}/{safe_name(product_name)}"
+
+            # Delete existing campaign folder if requested (fresh upload)
+            if delete_existing:
+                self.delete_folder(campaign_folder)
+
+            if self.create_folder(campaign_folder):
+                logger.info(f"Dropbox folder ready: {self.base_path}/{campaign_folder}")
+
+            for asset_path in asset_paths:
+                if not asset_path.exists():
+                    logger.warning(f"Dropbox upload skipped - Asset not found: {asset_path}")
+                    failed.append(str(asset_path))
+                    continue
+
+                items.append((asset_path, f"{campaign_folder}/{asset_path.name}"))
+
+        if report_path is not None:
+            if report_path.exists():
+                self.create_folder(f"{campaign_id}/reports")
+                items.append((report_path, f"{campaign_id}/reports/{report_path.name}"))
+            else:
+                logger.error(f"Dropbox upload failed - Report not found: {report_path}")
+                failed.append(str(report_path))
+
+        batch_uploaded, batch_failed = self._upload_items(items)
+        uploaded.update(batch_uploaded)
+        failed.extend(batch_failed)
+
+        # Log completion summary
+        if failed:
+            logger.warning(f"Dropbox upload incomplete - {len(failed)} of {len(uploaded) + len(failed)} files failed")
+        else:
+            logger.info(f"Dropbox upload complete - {len(uploaded)} files uploaded to {self.base_path}/{campaign_id}")
+
+        return uploaded
+
     def upload_campaign_assets(
         self,
         campaign_id: str,
@@ -104,8 +387,7 @@ class DropboxUploader:
 
         uploaded = {}
         failed = []
-        safe_product_name = "".join(c if c.isalnum() or c in "_ " else "_" for c in product_name).replace(" ", "_")
-        campaign_folder = f"{campaign_id}/{safe_product_name}"
+        campaign_folder = f"{campaign_id}/{safe_name(product_name)}"
 
         # Delete existing campaign folder if requested (fresh upload)
         if delete_existing:
@@ -116,20 +398,19 @@ class DropboxUploader:
         if folder_created:
             logger.info(f"Dropbox folder ready: {self.base_path}/{campaign_folder}")
 
+        existing_paths = []
         for asset_path in asset_paths:
             if not asset_path.exists():
                 logger.warning(f"Dropbox upload skipped - Asset not found: {asset_path}")
                 failed.append(str(asset_path))
                 continue
+            existing_paths.append(asset_path)
 
-            dropbox_path = f"{campaign_id}/{safe_product_name}/{asset_path.name}"
-            url = self.upload_file(asset_path, dropbox_path)
-
-            if url:
-                uploaded[str(asset_path)] = url
-            else:
-                logger.error(f"Dropbox upload failed for asset: {asset_path.name}")
-                failed.append(str(asset_path))
+        asset_uploaded, asset_failed = self._upload_items(
+            [(asset_path, f"{campaign_folder}/{asset_path.name}") for asset_path in existing_paths]
+        )
+        uploaded.update(asset_uploaded)
+        failed.extend(asset_failed)
 
         # Log completion summary
         if failed:
@@ -165,6 +446,24 @@ class DropboxUploader:
 
         return url
 
+    @staticmethod
+    def _iter_files(local_dir: Path) -> Iterator[Tuple[Path, str]]:
+        """
+        Walk a directory tree for regular files
+        Summary: Yields (path, '/'-separated path relative to local_dir) using scandir entries, so no extra stat per file
+        """
+        root = str(local_dir)
+        prefix_len = len(os.path.join(root, ''))
+        stack = [root]
+
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield Path(entry.path), entry.path[prefix_len:].replace(os.sep, '/')
+
     def upload_directory(self, local_dir: Path, dropbox_dir: str) -> int:
         """
         Upload entire directory to Dropbox
@@ -179,12 +478,14 @@ class DropboxUploader:
 
         uploaded_count = 0
 
-        for file_path in local_dir.rglob('*'):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(local_dir)
-                dropbox_path = f"{dropbox_dir}/{relative_path}".replace('\\', '/')
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as executor:
+            futures = []
+            for file_path, relative_path in self._iter_files(local_dir):
+                full_path = self._join_path(dropbox_dir, relative_path)
+                futures.append(executor.submit(self._upload_bytes, file_path, full_path))
 
-                if self.upload_file(file_path, dropbox_path):
+            for future in as_completed(futures):
+                if future.result():
                     uploaded_count += 1
 
         return uploaded_count
@@ -198,7 +499,7 @@ class DropboxUploader:
             return False
 
         try:
-            full_path = f"{self.base_path}/{folder_path}".replace('//', '/')
+            full_path = self._join_path(folder_path)
             self.dbx.files_delete_v2(full_path)
             logger.info(f"Deleted Dropbox folder: {full_path}")
             return True
@@ -219,7 +520,7 @@ class DropboxUploader:
         if not self.enabled:
             return False
 
-        full_path = f"{self.base_path}/{folder_path}".replace('//', '/')
+        full_path = self._join_path(folder_path)
 
         # Delete existing folder if requested
         if delete_if_exists:
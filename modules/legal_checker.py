@@ -5,13 +5,83 @@ Summary: Scans campaign messages for prohibited words and legal violations
 
 import logging
 import json
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Optional, Set, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # Optional C-level multi-pattern matcher
+    ahocorasick = None
 
 from schemas.campaign import LegalCheckResult
 
 logger = logging.getLogger(__name__)
 
+SEVERITY_RANK = {"NONE": 0, "WARNING": 1, "ERROR": 2}
+
+
+class _Matcher(NamedTuple):
+    # (category, severity, word) in dictionary order, so reports stay stable
+    entries: List[Tuple[str, str, str]]
+    automaton: Optional[object]
+    pattern: Optional[re.Pattern]
+    implied: Dict[str, Set[int]]
+
+
+def _compile_matcher(prohibited_words: Dict) -> _Matcher:
+    """
+    Compile prohibited words into a single matcher
+    Summary: Builds an Aho-Corasick automaton (or a union regex fallback) resolving to word entries
+    """
+    entries = []
+    needles: Dict[str, List[int]] = {}
+
+    for category, config in prohibited_words.items():
+        severity = config.get("severity", "WARNING")
+        for word in config.get("words", []):
+            needles.setdefault(word.lower(), []).append(len(entries))
+            entries.append((category, severity, word))
+
+    automaton = None
+    if ahocorasick is not None and needles:
+        automaton = ahocorasick.Automaton()
+        for needle, indices in needles.items():
+            automaton.add_word(needle, tuple(indices))
+        automaton.make_automaton()
+
+    # Fallback: one union regex, tried at every position via a lookahead.
+    # Longest needles come first, so the match at a position implies every
+    # needle it contains, which keeps plain substring semantics.
+    pattern = None
+    implied: Dict[str, Set[int]] = {}
+    if automaton is None and needles:
+        ordered = sorted(needles, key=len, reverse=True)
+        pattern = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+        implied = {
+            needle: {
+                index
+                for other, indices in needles.items()
+                if other in needle
+                for index in indices
+            }
+            for needle in ordered
+        }
+
+    return _Matcher(entries, automaton, pattern, implied)
+
+
+@lru_cache(maxsize=4)
+def _load_prohibited(path: str, mtime: float) -> Tuple[Dict, _Matcher]:
+    """
+    Load prohibited words from JSON file and compile their matcher
+    Summary: Cached per path and modification time, so every checker shares one parse and one compiled matcher
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        prohibited_words = json.load(f)
+    return prohibited_words, _compile_matcher(prohibited_words)
+
 
 class LegalChecker:
     """Checks campaign content for legal compliance"""
@@ -20,19 +90,36 @@ class LegalChecker:
         """
         Initialize legal checker with prohibited words dictionary
         """
-        self.prohibited_words = self._load_prohibited_words(prohibited_words_path)
+        # Shared with other checkers through the load cache; never mutated in place
+        self.prohibited_words, self._matcher = self._load_prohibited_words(prohibited_words_path)
 
-    def _load_prohibited_words(self, path: Path) -> Dict:
+    def _load_prohibited_words(self, path: Path) -> Tuple[Dict, _Matcher]:
         """
         Load prohibited words from JSON file
-        Summary: Reads prohibited words configuration
+        Summary: Reads prohibited words configuration, reusing the cached parse while the file is unchanged
         """
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_prohibited(str(path), path.stat().st_mtime)
         except Exception as e:
             logger.error(f"Failed to load prohibited words: {e}")
-            return {}
+            return {}, _compile_matcher({})
+
+    def _find_matches(self, text_lower: str, split: int) -> Tuple[Set[int], Set[int]]:
+        """
+        Find prohibited words contained in lowercase text
+        Summary: Returns indices into the word entries found before and after the split offset, matching substrings like the original scan
+        """
+        matcher = self._matcher
+        before, after = set(), set()
+
+        if matcher.automaton is not None:
+            for end, indices in matcher.automaton.iter(text_lower):
+                (before if end < split else after).update(indices)
+        elif matcher.pattern is not None:
+            for match in matcher.pattern.finditer(text_lower):
+                (before if match.start() < split else after).update(matcher.implied[match.group(1)])
+
+        return before, after
 
     def check_content(self, message: str, translated_message: str) -> LegalCheckResult:
         """
@@ -43,30 +130,30 @@ class LegalChecker:
             all_violations = []
             highest_severity = "NONE"
 
-            # Check both original and translated messages
+            # Scan both messages in one pass; no prohibited word contains the
+            # NUL separator, so a match never spans the two messages
+            message_lower = message.lower()
+            original_found, translated_found = self._find_matches(
+                message_lower + "\x00" + translated_message.lower(),
+                len(message_lower)
+            )
+
             messages = [
-                ("original", message),
-                ("translated", translated_message)
+                ("original", original_found),
+                ("translated", translated_found)
             ]
 
-            for msg_type, msg_text in messages:
-                msg_lower = msg_text.lower()
-
-                for category, config in self.prohibited_words.items():
-                    severity = config.get("severity", "WARNING")
-                    words = config.get("words", [])
+            for msg_type, found in messages:
+                for index in sorted(found):
+                    category, severity, word = self._matcher.entries[index]
 
-                    for word in words:
-                        if word.lower() in msg_lower:
-                            violation = f"[{severity}] {category}: '{word}' in {msg_type} message"
-                            all_violations.append(violation)
-                            logger.warning(violation)
+                    violation = f"[{severity}] {category}: '{word}' in {msg_type} message"
+                    all_violations.append(violation)
+                    logger.warning(violation)
 
-                            # Update highest severity
-                            if severity == "ERROR":
-                                highest_severity = "ERROR"
-                            elif severity == "WARNING" and highest_severity == "NONE":
-                                highest_severity = "WARNING"
+                    # Update highest severity
+                    if SEVERITY_RANK.get(severity, 0) > SEVERITY_RANK[highest_severity]:
+                        highest_severity = severity
 
             # Determine if content should be blocked
             blocked = highest_severity == "ERROR"
@@ -109,11 +196,15 @@ class LegalChecker:
         Add custom prohibited word at runtime
         Summary: Allows dynamic addition of prohibited terms
         """
-        if category not in self.prohibited_words:
-            self.prohibited_words[category] = {
-                "severity": severity,
-                "words": []
+        config = self.prohibited_words.get(category, {
+            "severity": severity,
+            "words": []
+        })
+
+        if word not in config["words"]:
+            # Copy on write, since the loaded dictionary is shared through the cache
+            self.prohibited_words = {
+                **self.prohibited_words,
+                category: {**config, "words": config["words"] + [word]}
             }
-
-        if word not in self.prohibited_words[category]["words"]:
-            self.prohibited_words[category]["words"].append(word)
+            self._matcher = _compile_matcher(self.prohibited_words)
@@ -3,24 +3,32 @@ from typing import Dict
 
 
 class PromptLoader:
+    # Shared across instances, keyed by prompt file path
+    _prompts: Dict[Path, str] = {}
+
     def __init__(self, prompts_dir: Path = Path("prompts")):
         self.prompts_dir = prompts_dir
-        self._prompts = {}
 
-    def load(self, prompt_name: str) -> str:
-        if prompt_name in self._prompts:
-            return self._prompts[prompt_name]
+    @classmethod
+    def preload(cls, prompts_dir: Path = Path("prompts")):
+        for prompt_file in prompts_dir.glob("*.txt"):
+            if prompt_file not in cls._prompts:
+                cls._prompts[prompt_file] = prompt_file.read_text(encoding='utf-8').strip()
 
+    def load(self, prompt_name: str) -> str:
         prompt_file = self.prompts_dir / f"{prompt_name}.txt"
+        if prompt_file in self._prompts:
+            return self._prompts[prompt_file]
+
         if not prompt_file.exists():
             raise FileNotFoundError(f"Prompt file not found: {prompt_file}")
 
         with open(prompt_file, 'r', encoding='utf-8') as f:
             template = f.read().strip()
 
-        self._prompts[prompt_name] = template
+        self._prompts[prompt_file] = template
         return template
 
     def format(self, prompt_name: str, **kwargs) -> str:
         template = self.load(prompt_name)
-        return template.format(**kwargs)
\ No newline at end of file
+        return template.format(**kwargs)
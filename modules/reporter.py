@@ -5,11 +5,17 @@ Summary: Generates execution logs and summary reports in JSON format
 
 import logging
 import json
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any
 
-from config import settings
+try:
+    import orjson
+except ImportError:  # Optional faster JSON serializer
+    orjson = None
+
+from config import get_settings
 from schemas.campaign import CampaignOutput
 
 logger = logging.getLogger(__name__)
@@ -22,7 +28,7 @@ class Reporter:
         """
         Initialize reporter
         """
-        self.reports_dir = settings.reports_dir
+        self.reports_dir = get_settings().reports_dir
         self.reports_dir.mkdir(exist_ok=True)
 
     def generate_report(
@@ -41,19 +47,16 @@ class Reporter:
             report_filename = f"campaign_{campaign_id}_{timestamp}.json"
             report_path = self.reports_dir / report_filename
 
-            # Calculate statistics
+            # Calculate statistics and group by product in a single pass
             total_campaigns = len(outputs)
-            assets_generated = sum(1 for o in outputs if o.asset_generated)
-            assets_reused = total_campaigns - assets_generated
-            compliance_passed = sum(1 for o in outputs if o.compliance_passed)
-            compliance_failed = total_campaigns - compliance_passed
-            total_legal_flags = sum(len(o.legal_flags) for o in outputs)
-
-            # Group by product
-            products = {}
+            assets_generated = 0
+            compliance_passed = 0
+            total_legal_flags = 0
+            products = defaultdict(list)
             for output in outputs:
-                if output.product_name not in products:
-                    products[output.product_name] = []
+                assets_generated += output.asset_generated
+                compliance_passed += output.compliance_passed
+                total_legal_flags += len(output.legal_flags)
                 products[output.product_name].append({
                     "aspect_ratio": output.aspect_ratio,
                     "output_path": output.output_path,
@@ -63,6 +66,8 @@ class Reporter:
                     "legal_flags": output.legal_flags,
                     "generation_time_seconds": output.generation_time_seconds
                 })
+            assets_reused = total_campaigns - assets_generated
+            compliance_failed = total_campaigns - compliance_passed
 
             # Build report
             report = {
@@ -85,8 +90,12 @@ class Reporter:
             }
 
             # Write report to file
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                # orjson emits UTF-8 bytes directly, matching ensure_ascii=False output
+                report_path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+            else:
+                with open(report_path, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2, ensure_ascii=False)
 
             self._print_summary(report)
 
@@ -0,0 +1,21 @@
+"""
+Shared helpers module
+Summary: Small pure helpers reused across pipeline modules
+"""
+
+from functools import lru_cache
+
+# Every non-alphanumeric ASCII character (spaces included) maps to "_"
+_SAFE_NAME_TABLE = str.maketrans({chr(i): "_" for i in range(128) if not chr(i).isalnum()})
+
+
+@lru_cache(maxsize=1024)
+def safe_name(name: str) -> str:
+    """
+    Sanitize a name for use in file and folder paths
+    Summary: Replaces every non-alphanumeric character (including spaces) with "_"
+    """
+    if name.isascii():
+        return name.translate(_SAFE_NAME_TABLE)
+
+    return "".join(c if c.isalnum() else "_" for c in name)
@@ -1,135 +1,247 @@
+import asyncio
+import importlib.util
 import logging
+import mimetypes
+import random
+import threading
 import time
+from collections import deque
+from functools import lru_cache
 import base64
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 from io import BytesIO
 
+import httpx
 from google import genai
 from google.genai import types
+import numpy as np
 from PIL import Image
 
-from config import settings
+from config import get_settings
 from modules.prompt_loader import PromptLoader
 
 logger = logging.getLogger(__name__)
 
+# google-genai switches its async transport to aiohttp whenever it can import it
+_SDK_USES_AIOHTTP = importlib.util.find_spec("aiohttp") is not None
+
+_TRANSLATION_LANGUAGE_MAP = {
+    "quebec": "French (Canadian)",
+    "france": "French",
+    "mexico": "Spanish (Mexican)",
+    "spain": "Spanish",
+    "india": "Hindi",
+    "japan": "Japanese",
+    "china": "Chinese (Simplified)",
+    "germany": "German",
+    "brazil": "Portuguese (Brazilian)"
+}
+
+
+@lru_cache(maxsize=32)
+def _load_resized_logo(logo_path: str, mtime: float, max_width: int) -> Image.Image:
+    """
+    Load brand logo as RGBA scaled to max_width
+    Summary: Cached per path, modification time and width, so each logo size is resampled once per run
+    """
+    logo = Image.open(logo_path).convert('RGBA')
+    logo_height = int(logo.height * (max_width / logo.width))
+    return logo.resize((max_width, logo_height), Image.Resampling.LANCZOS)
+
 
 class VertexAIService:
+    # Connection pool for the shared client; keeps TLS sessions warm across
+    # concurrent product and aspect-ratio requests
+    HTTP_MAX_CONNECTIONS = 32
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 16
+    RATE_WINDOW_SECONDS = 60
+    MAX_RETRIES = 3
+    MAX_RETRY_DELAY_SECONDS = 60
+
     def __init__(self):
+        settings = get_settings()
+        limits = httpx.Limits(
+            max_connections=self.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=self.HTTP_MAX_KEEPALIVE_CONNECTIONS
+        )
         self.client = genai.Client(
             vertexai=True,
             project=settings.gcp_project_id,
-            location=settings.gcp_location
+            location=settings.gcp_location,
+            http_options=types.HttpOptions(
+                client_args={"limits": limits},
+                # httpx.Limits is meaningless to aiohttp, which pools on its own
+                async_client_args=None if _SDK_USES_AIOHTTP else {"limits": limits}
+            )
         )
+        # Read every prompt template once, off the request path
+        PromptLoader.preload()
         self.prompt_loader = PromptLoader()
-        self._request_count = 0
-        self._last_request_time = time.time()
+        # Start times of the requests made within the last rate window
+        self._request_times = deque(maxlen=max(1, settings.imagen_rpm_limit))
+        self._rate_lock = threading.Lock()
+        # Bounds in-flight image compositions across product/aspect-ratio threads
+        self._compose_semaphore = threading.Semaphore(settings.imagen_max_concurrent_requests)
+        # Same cap for product generations gathered on the pipeline's event loop
+        self._generate_semaphore = asyncio.Semaphore(settings.imagen_max_concurrent_requests)
+
+    def _reserve_request_slot(self) -> float:
+        """
+        Claim a slot in the rate window if one is free
+        Summary: Returns 0 once a request start has been recorded, otherwise how long to wait before trying again
+        """
+        with self._rate_lock:
+            now = time.monotonic()
+            if (len(self._request_times) == self._request_times.maxlen
+                    and now - self._request_times[0] < self.RATE_WINDOW_SECONDS):
+                return self.RATE_WINDOW_SECONDS - (now - self._request_times[0])
+            self._request_times.append(now)
+            return 0.0
 
     def _rate_limit(self):
-        current_time = time.time()
-        elapsed = current_time - self._last_request_time
-
-        if self._request_count >= settings.imagen_rpm_limit:
-            if elapsed < 60:
-                sleep_time = 60 - elapsed
-                logger.info(f"Rate limit reached. Sleeping for {sleep_time:.2f}s")
-                time.sleep(sleep_time)
-                self._request_count = 0
-                self._last_request_time = time.time()
-            else:
-                self._request_count = 0
-                self._last_request_time = current_time
-
-        self._request_count += 1
-
-    def generate_product_asset(
+        """
+        Block until a request slot is free
+        Summary: Sliding-window limiter over monotonic timestamps; waits only as long as the oldest request in the window needs to age out
+        """
+        # The lock is only held while checking the window, never while sleeping
+        while (sleep_time := self._reserve_request_slot()) > 0:
+            logger.info(f"Rate limit reached. Sleeping for {sleep_time:.2f}s")
+            time.sleep(sleep_time)
+
+    async def _arate_limit(self):
+        """
+        Async counterpart of _rate_limit
+        Summary: Shares the same request window as the sync methods but yields to the event loop while waiting
+        """
+        while (sleep_time := self._reserve_request_slot()) > 0:
+            logger.info(f"Rate limit reached. Sleeping for {sleep_time:.2f}s")
+            await asyncio.sleep(sleep_time)
+
+    @classmethod
+    def _retry_delay(cls, error: Exception, attempt: int) -> float:
+        """
+        Work out how long to back off before retrying a rate-limited call
+        Summary: Honours a numeric Retry-After header when the SDK exposes the response, otherwise exponential backoff with jitter
+        """
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+        if headers:
+            try:
+                return min(cls.MAX_RETRY_DELAY_SECONDS, float(headers.get('Retry-After')))
+            except (TypeError, ValueError):
+                pass
+        return min(cls.MAX_RETRY_DELAY_SECONDS, 2 ** attempt + random.uniform(0, 1))
+
+    def _product_image_request(
+        self,
+        product_name: str,
+        product_description: str,
+        brand_theme: str
+    ) -> tuple[str, types.GenerateImagesConfig]:
+        prompt = self.prompt_loader.format(
+            "product_image_generation",
+            product_name=product_name,
+            product_description=product_description,
+            brand_theme=brand_theme
+        )
+        config = types.GenerateImagesConfig(
+            number_of_images=1,
+            aspect_ratio="1:1",
+            safety_filter_level="block_medium_and_above",
+            person_generation="allow_adult"
+        )
+        return prompt, config
+
+    @staticmethod
+    def _save_generated_image(response, output_path: Path) -> bool:
+        if response.generated_images:
+            # The SDK already decodes the payload into raw image bytes
+            output_path.write_bytes(response.generated_images[0].image.image_bytes)
+            return True
+
+        return False
+
+    def _translation_prompt(
+        self,
+        message: str,
+        region: str,
+        target_audience: str
+    ) -> Optional[str]:
+        """
+        Build the translation prompt for a region
+        Summary: Returns None when the region is English and no translation call is needed
+        """
+        target_language = _TRANSLATION_LANGUAGE_MAP.get(region.lower(), "English")
+
+        if target_language == "English":
+            return None
+
+        return self.prompt_loader.format(
+            "message_translation",
+            target_language=target_language,
+            region=region,
+            target_audience=target_audience,
+            message=message
+        )
+
+    async def agenerate_product_asset(
         self,
         product_name: str,
         product_description: str,
         brand_theme: str,
         output_path: Path
     ) -> bool:
-        try:
-            self._rate_limit()
-
-            prompt = self.prompt_loader.format(
-                "product_image_generation",
-                product_name=product_name,
-                product_description=product_description,
-                brand_theme=brand_theme
-            )
-
-            response = self.client.models.generate_images(
-                model=settings.imagen_model,
-                prompt=prompt,
-                config=types.GenerateImagesConfig(
-                    number_of_images=1,
-                    aspect_ratio="1:1",
-                    safety_filter_level="block_medium_and_above",
-                    person_generation="allow_adult"
+        """
+        Generate a product image and save it to output_path
+        Summary: Uses the SDK's async client so generation can overlap with other API calls on one event loop
+        """
+        async with self._generate_semaphore:
+            try:
+                await self._arate_limit()
+
+                prompt, config = self._product_image_request(product_name, product_description, brand_theme)
+
+                response = await self.client.aio.models.generate_images(
+                    model=get_settings().imagen_model,
+                    prompt=prompt,
+                    config=config
                 )
-            )
-
-            if response.generated_images:
-                image_base64 = response.generated_images[0].image.image_bytes
-                image_bytes = base64.b64decode(image_base64)
-                with open(str(output_path), 'wb') as f:
-                    f.write(image_bytes)
-                return True
 
-            return False
+                return self._save_generated_image(response, output_path)
 
-        except Exception as e:
-            logger.error(f"Error generating product asset: {e}")
-            return False
+            except Exception as e:
+                logger.error(f"Error generating product asset: {e}")
+                return False
 
-    def translate_message(
+    async def atranslate_message(
         self,
         message: str,
         region: str,
         target_audience: str
     ) -> str:
+        """
+        Translate the campaign message for a region
+        Summary: Retries rate-limited calls with backoff, awaiting the async client instead of blocking the thread
+        """
         try:
-            self._rate_limit()
-
-            language_map = {
-                "quebec": "French (Canadian)",
-                "france": "French",
-                "mexico": "Spanish (Mexican)",
-                "spain": "Spanish",
-                "india": "Hindi",
-                "japan": "Japanese",
-                "china": "Chinese (Simplified)",
-                "germany": "German",
-                "brazil": "Portuguese (Brazilian)"
-            }
-
-            target_language = language_map.get(region.lower(), "English")
-
-            if target_language == "English":
-                return message
+            await self._arate_limit()
 
-            prompt = self.prompt_loader.format(
-                "message_translation",
-                target_language=target_language,
-                region=region,
-                target_audience=target_audience,
-                message=message
-            )
+            prompt = self._translation_prompt(message, region, target_audience)
+            if prompt is None:
+                return message
 
-            max_retries = 3
-            for attempt in range(max_retries):
+            for attempt in range(self.MAX_RETRIES):
                 try:
-                    response = self.client.models.generate_content(
-                        model=settings.gemini_text_model,
+                    response = await self.client.aio.models.generate_content(
+                        model=get_settings().gemini_text_model,
                         contents=prompt
                     )
                     return response.text.strip()
                 except Exception as retry_error:
-                    if "429" in str(retry_error) and attempt < max_retries - 1:
-                        wait_time = (attempt + 1) * 10
-                        time.sleep(wait_time)
+                    if "429" in str(retry_error) and attempt < self.MAX_RETRIES - 1:
+                        wait_time = self._retry_delay(retry_error, attempt)
+                        await asyncio.sleep(wait_time)
                     else:
                         raise retry_error
 
@@ -149,84 +261,99 @@ class VertexAIService:
         aspect_ratio: str,
         output_path: Path,
         product_description: str = ""
-    ) -> bool:
-        try:
-            self._rate_limit()
-
-            prompt = self.prompt_loader.format(
-                "campaign_composition",
-                dimensions=aspect_ratio,
-                original_message=original_message,
-                translated_message=translated_message,
-                brand_font=brand_font,
-                primary_color=brand_colors['primary'],
-                secondary_color=brand_colors['secondary'],
-                brand_domain=brand_domain,
-                product_description=product_description
-            )
-
-            product_image = Image.open(product_asset_path)
-
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash-image",
-                contents=[product_image, prompt],
-                config=types.GenerateContentConfig(
-                    response_modalities=[types.Modality.IMAGE],
-                    image_config=types.ImageConfig(aspect_ratio=aspect_ratio)
+    ) -> Optional[np.ndarray]:
+        """
+        Compose campaign asset and save it to output_path
+        Summary: Returns the final image as an RGB array so callers can skip re-decoding the file, or None on failure
+        """
+        with self._compose_semaphore:
+            try:
+                self._rate_limit()
+
+                prompt = self.prompt_loader.format(
+                    "campaign_composition",
+                    dimensions=aspect_ratio,
+                    original_message=original_message,
+                    translated_message=translated_message,
+                    brand_font=brand_font,
+                    primary_color=brand_colors['primary'],
+                    secondary_color=brand_colors['secondary'],
+                    brand_domain=brand_domain,
+                    product_description=product_description
                 )
-            )
 
-            # Check if response was blocked or empty
-            if not response.candidates:
-                logger.error(f"Gemini 2.5 Flash Image returned no candidates - Content may be blocked by safety filters")
-                logger.error(f"Prompt safety: {response.prompt_feedback if hasattr(response, 'prompt_feedback') else 'N/A'}")
-                return False
-
-            if not response.candidates[0].content.parts:
-                logger.error(f"Gemini 2.5 Flash Image returned empty response - No image generated")
-                logger.error(f"Finish reason: {response.candidates[0].finish_reason if hasattr(response.candidates[0], 'finish_reason') else 'N/A'}")
-                return False
-
-            for part in response.candidates[0].content.parts:
-                if part.inline_data:
-                    edited = Image.open(BytesIO(base64.b64decode(part.inline_data.data)))
-                    temp_path = output_path.parent / f"temp_{output_path.name}"
-                    edited.save(str(temp_path))
-                    self._add_logo_overlay(temp_path, brand_logo_path, output_path)
-                    temp_path.unlink()
-                    return True
-
-            logger.error(f"Gemini 2.5 Flash Image response contained no inline_data")
-            return False
+                # Send the encoded file as-is rather than letting the SDK re-encode a PIL image
+                product_part = types.Part.from_bytes(
+                    data=product_asset_path.read_bytes(),
+                    mime_type=mimetypes.guess_type(product_asset_path.name)[0] or "image/png"
+                )
 
-        except Exception as e:
-            logger.error(f"Error composing campaign asset: {e}")
-            return False
+                response = self.client.models.generate_content(
+                    model="gemini-2.5-flash-image",
+                    contents=[product_part, prompt],
+                    config=types.GenerateContentConfig(
+                        response_modalities=[types.Modality.IMAGE],
+                        image_config=types.ImageConfig(aspect_ratio=aspect_ratio)
+                    )
+                )
 
-    def _add_logo_overlay(self, campaign_image_path: Path, logo_path: Path, output_path: Path):
+                # Check if response was blocked or empty
+                if not response.candidates:
+                    logger.error(f"Gemini 2.5 Flash Image returned no candidates - Content may be blocked by safety filters")
+                    logger.error(f"Prompt safety: {response.prompt_feedback if hasattr(response, 'prompt_feedback') else 'N/A'}")
+                    return None
+
+                if not response.candidates[0].content.parts:
+                    logger.error(f"Gemini 2.5 Flash Image returned empty response - No image generated")
+                    logger.error(f"Finish reason: {response.candidates[0].finish_reason if hasattr(response.candidates[0], 'finish_reason') else 'N/A'}")
+                    return None
+
+                for part in response.candidates[0].content.parts:
+                    if part.inline_data:
+                        image_data = part.inline_data.data
+                        # Blob.data is normally decoded bytes; only base64 strings need decoding
+                        if not isinstance(image_data, (bytes, bytearray)):
+                            image_data = base64.b64decode(image_data)
+                        edited = Image.open(BytesIO(image_data)).convert('RGBA')
+                        final = self._add_logo_overlay(edited, brand_logo_path, output_path)
+                        return np.asarray(final.convert('RGB'))
+
+                logger.error(f"Gemini 2.5 Flash Image response contained no inline_data")
+                return None
+
+            except Exception as e:
+                logger.error(f"Error composing campaign asset: {e}")
+                return None
+
+    def _add_logo_overlay(self, campaign_image: Image.Image, logo_path: Path, output_path: Path) -> Image.Image:
+        """
+        Overlay the brand logo on the decoded campaign image and save it once to output_path
+        Summary: Works on the in-memory image so no intermediate file is written or re-read
+        """
         try:
-            campaign = Image.open(campaign_image_path).convert('RGBA')
+            campaign = campaign_image if campaign_image.mode == 'RGBA' else campaign_image.convert('RGBA')
             width, height = campaign.size
-            logo = Image.open(logo_path).convert('RGBA')
-
             logo_max_width = int(width * 0.1)
-            logo_ratio = logo_max_width / logo.width
-            logo_height = int(logo.height * logo_ratio)
-            logo = logo.resize((logo_max_width, logo_height), Image.Resampling.LANCZOS)
+            # Shared across threads; only ever read as a paste source and mask
+            logo = _load_resized_logo(str(logo_path), logo_path.stat().st_mtime, logo_max_width)
 
             padding = 20
             logo_position = (width - logo_max_width - padding, padding)
 
-            logo_layer = Image.new('RGBA', campaign.size, (0, 0, 0, 0))
-            logo_layer.paste(logo, logo_position, logo)
-
-            final = Image.alpha_composite(campaign, logo_layer)
+            # Blend in place over the logo-sized region only, not a full-canvas layer
+            campaign.alpha_composite(logo, dest=logo_position)
+            final = campaign
 
             if output_path.suffix.lower() in ['.jpg', '.jpeg']:
                 final = final.convert('RGB')
 
             final.save(str(output_path))
+            return final
 
         except Exception as e:
             logger.error(f"Error adding logo overlay: {e}")
-            Image.open(campaign_image_path).save(str(output_path))
+            fallback = campaign_image
+            if output_path.suffix.lower() in ['.jpg', '.jpeg']:
+                fallback = fallback.convert('RGB')
+            fallback.save(str(output_path))
+            return fallback
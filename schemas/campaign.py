@@ -1,5 +1,10 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Annotated, List, Optional
+from pydantic import BaseModel, Field, ConfigDict, StringConstraints
+
+HEX_RE = r"^#[0-9A-Fa-f]{6}$"
+
+# Shared by every color field, so the constraint is built once
+HexColor = Annotated[str, StringConstraints(pattern=HEX_RE)]
 
 
 class Product(BaseModel):
@@ -10,8 +15,8 @@ class Product(BaseModel):
 
 class Brand(BaseModel):
     logo_path: str
-    primary_color: str = Field(..., pattern=r"^#[0-9A-Fa-f]{6}$")
-    secondary_color: str = Field(..., pattern=r"^#[0-9A-Fa-f]{6}$")
+    primary_color: HexColor
+    secondary_color: HexColor
     font_name: str
     theme: str
     domain: str
@@ -42,6 +47,8 @@ class CampaignOutput(BaseModel):
 
 
 class ComplianceResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     logo_detected: bool
     logo_confidence: float
     primary_color_present: bool
@@ -53,6 +60,8 @@ class ComplianceResult(BaseModel):
 
 
 class LegalCheckResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     prohibited_words_found: List[str]
     severity: str
     blocked: bool